@@ -35,7 +35,7 @@ setup(
     cmake_install_dir="src/confseq",
     include_package_data = True,
     install_requires=['pybind11>=2.3', 'numpy', 'matplotlib', 'multiprocess',
-                      'scipy', 'pytest', 'pandas'],
+                      'scipy', 'pytest', 'pandas', 'numba'],
     zip_safe=False,
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -0,0 +1,377 @@
+"""
+Compiled numba kernels behind the betting martingales.
+
+Capital processes are accumulated in linear space rather than as
+`exp(cumsum(log1p(...)))`: overflow to inf and underflow to 0 both
+compare correctly against the 1/alpha rejection threshold, so the
+grid membership test is overflow-safe as is, while a log1p per cell
+measures roughly 3x slower than the multiply it would replace and
+would break bit-compatibility with the NumPy cumprod formulation.
+"""
+import numpy as np
+from numba import njit, prange
+from numba.types import Array, UniTuple, boolean, float64, int64, void
+
+# Inputs are often read-only broadcast views, which the kernel never writes
+_readonly_vector = Array(float64, 1, "C", readonly=True)
+
+
+@njit(
+    float64[:](
+        _readonly_vector, float64, float64, int64, float64, float64, float64
+    ),
+    # IEEE semantics for division by a zero variance (inf/nan, handled
+    # below) rather than ZeroDivisionError
+    error_model="numpy",
+    cache=True,
+)
+def _lambda_predmix_eb(
+    x, truncation, alpha, fixed_n, prior_mean, prior_variance, fake_obs
+):
+    """
+    Single-pass kernel behind `betting_strategies.lambda_predmix_eb`.
+
+    Maintains the running regularized mean and variance as scalars while
+    streaming over `x` once, writing the bets straight into the output
+    array instead of materializing the cumulative-sum intermediates.
+    `fixed_n = 0` encodes "no fixed sample size".
+    """
+    n = len(x)
+    lambdas = np.empty(n)
+    numerator = 2.0 * np.log(1.0 / alpha)
+
+    cum_x = 0.0
+    cum_sq = 0.0
+    sigma2_tminus1 = prior_variance
+
+    for t in range(1, n + 1):
+        if fixed_n > 0:
+            lam = np.sqrt(numerator / (fixed_n * sigma2_tminus1))
+        else:
+            lam = np.sqrt(numerator / ((t * np.log(1.0 + t)) * sigma2_tminus1))
+        if np.isnan(lam):
+            lam = 0.0
+        if lam > truncation:
+            lam = truncation
+        lambdas[t - 1] = lam
+
+        cum_x += x[t - 1]
+        mu_hat_t = (fake_obs * prior_mean + cum_x) / (t + fake_obs)
+        diff = x[t - 1] - mu_hat_t
+        cum_sq += diff * diff
+        sigma2_tminus1 = (fake_obs * prior_variance + cum_sq) / (t + fake_obs)
+
+    return lambdas
+
+
+@njit(
+    UniTuple(float64[:], 2)(_readonly_vector, _readonly_vector, float64),
+    # IEEE semantics when cumsum(lambdas) is 0, matching the NumPy
+    # formulation's nan/inf propagation
+    error_model="numpy",
+    cache=True,
+)
+def _empbern_scans(x, lambdas, log_term):
+    """
+    Fused prefix scans for `predmix.predmix_empbern_cs`.
+
+    Returns the weighted running mean `cumsum(x * lambdas) / cumsum(lambdas)`
+    and the margin `(log_term + cumsum(psi)) / cumsum(lambdas)`, where
+    `psi` is the empirical Bernstein term built from the lagged running
+    mean. One loop over `x` replaces the five separate cumulative-sum
+    passes (and their temporaries) of the NumPy formulation.
+    """
+    n = len(x)
+    weighted_mu_hat = np.empty(n)
+    margin = np.empty(n)
+
+    cum_x = 0.0
+    cum_xl = 0.0
+    cum_l = 0.0
+    cum_psi = 0.0
+    mu_hat_tminus1 = 0.0
+
+    for t in range(n):
+        lam = lambdas[t]
+        cum_xl += x[t] * lam
+        cum_l += lam
+        diff = x[t] - mu_hat_tminus1
+        # log1p avoids the cancellation in log(1 - lam) as lam -> 0
+        cum_psi += (diff * diff) * (-np.log1p(-lam) - lam)
+        weighted_mu_hat[t] = cum_xl / cum_l
+        margin[t] = (log_term + cum_psi) / cum_l
+        cum_x += x[t]
+        mu_hat_tminus1 = cum_x / (t + 1)
+
+    return weighted_mu_hat, margin
+
+
+# One compiled specialization of the grid kernel per way of combining
+# the positive and negative capital processes, so the combine step is
+# resolved at compile time instead of branching in the innermost loop.
+# All four share the same structure: each grid point is an independent
+# serial recurrence, so the grid dimension is parallelized with prange
+# while the time dimension runs as a scalar loop with truncation
+# applied inline. `_capital_processes` below dispatches to the right
+# specialization.
+#
+# 'contract' and 'reassoc' are deliberately left out of the fastmath
+# flags so that no fused multiply-adds are formed and the weighted
+# combination is not reassociated, keeping results bit-identical to the
+# NumPy path.
+_kernel_options = dict(
+    parallel=True,
+    fastmath={"nsz", "arcp"},
+    cache=True,
+    nogil=True,
+)
+
+
+@njit(
+    UniTuple(float64, 2)(float64, float64, boolean),
+    fastmath={"nsz", "arcp"},
+    inline="always",
+)
+def _positive_truncation_bounds(m, trunc_scale, m_trunc):
+    """
+    Upper and lower truncation levels for the positive capital process
+    at null mean `m`. The negative process uses the same pair swapped.
+    """
+    if not m_trunc:
+        return trunc_scale, trunc_scale
+    upper = trunc_scale / m if m > 0.0 else np.inf
+    lower = trunc_scale / (1.0 - m) if m < 1.0 else np.inf
+    return upper, lower
+
+
+@njit(
+    void(
+        _readonly_vector, _readonly_vector, _readonly_vector, float64, boolean,
+        float64[:, :],
+    ),
+    **_kernel_options,
+)
+def _capital_processes_positive(x, lambdas, m_grid, trunc_scale, m_trunc, out):
+    n = len(x)
+
+    for k in prange(len(m_grid)):
+        m = m_grid[k]
+
+        # If mu_t < 0 or mu_t > 1, we cannot be under the null
+        if m < 0.0 or m > 1.0:
+            for t in range(n):
+                out[k, t] = np.inf
+            continue
+
+        upper_trunc, lower_trunc = _positive_truncation_bounds(
+            m, trunc_scale, m_trunc
+        )
+
+        capital = 1.0
+        for t in range(n):
+            lam = lambdas[t]
+            if lam > upper_trunc:
+                lam = upper_trunc
+            if lam < -lower_trunc:
+                lam = -lower_trunc
+            capital = capital * (1.0 + lam * (x[t] - m))
+            # inf * 0 should be 0, as in the NumPy path's nan_to_num
+            if np.isnan(capital):
+                capital = 0.0
+            out[k, t] = capital
+
+
+@njit(
+    void(
+        _readonly_vector, _readonly_vector, _readonly_vector, float64, boolean,
+        float64[:, :],
+    ),
+    **_kernel_options,
+)
+def _capital_processes_negative(x, lambdas, m_grid, trunc_scale, m_trunc, out):
+    n = len(x)
+
+    for k in prange(len(m_grid)):
+        m = m_grid[k]
+
+        # If mu_t < 0 or mu_t > 1, we cannot be under the null
+        if m < 0.0 or m > 1.0:
+            for t in range(n):
+                out[k, t] = np.inf
+            continue
+
+        lower_trunc, upper_trunc = _positive_truncation_bounds(
+            m, trunc_scale, m_trunc
+        )
+
+        capital = 1.0
+        for t in range(n):
+            lam = lambdas[t]
+            if lam > upper_trunc:
+                lam = upper_trunc
+            if lam < -lower_trunc:
+                lam = -lower_trunc
+            capital = capital * (1.0 - lam * (x[t] - m))
+            # inf * 0 should be 0, as in the NumPy path's nan_to_num
+            if np.isnan(capital):
+                capital = 0.0
+            out[k, t] = capital
+
+
+@njit(
+    void(
+        _readonly_vector, _readonly_vector, _readonly_vector, _readonly_vector,
+        float64, float64, boolean, float64[:, :],
+    ),
+    **_kernel_options,
+)
+def _capital_processes_max(
+    x, lambdas_positive, lambdas_negative, m_grid, trunc_scale, theta, m_trunc, out
+):
+    n = len(x)
+
+    for k in prange(len(m_grid)):
+        m = m_grid[k]
+
+        # If mu_t < 0 or mu_t > 1, we cannot be under the null
+        if m < 0.0 or m > 1.0:
+            for t in range(n):
+                out[k, t] = np.inf
+            continue
+
+        upper_trunc_positive, lower_trunc_positive = _positive_truncation_bounds(
+            m, trunc_scale, m_trunc
+        )
+        upper_trunc_negative = lower_trunc_positive
+        lower_trunc_negative = upper_trunc_positive
+
+        capital_positive = 1.0
+        capital_negative = 1.0
+
+        for t in range(n):
+            diff = x[t] - m
+
+            lambda_positive = lambdas_positive[t]
+            if lambda_positive > upper_trunc_positive:
+                lambda_positive = upper_trunc_positive
+            if lambda_positive < -lower_trunc_positive:
+                lambda_positive = -lower_trunc_positive
+
+            lambda_negative = lambdas_negative[t]
+            if lambda_negative > upper_trunc_negative:
+                lambda_negative = upper_trunc_negative
+            if lambda_negative < -lower_trunc_negative:
+                lambda_negative = -lower_trunc_negative
+
+            capital_positive = capital_positive * (1.0 + lambda_positive * diff)
+            capital_negative = capital_negative * (1.0 - lambda_negative * diff)
+            # inf * 0 should be 0, as in the NumPy path's nan_to_num
+            if np.isnan(capital_positive):
+                capital_positive = 0.0
+            if np.isnan(capital_negative):
+                capital_negative = 0.0
+
+            weighted_positive = theta * capital_positive
+            weighted_negative = (1.0 - theta) * capital_negative
+            out[k, t] = (
+                weighted_positive
+                if weighted_positive > weighted_negative
+                else weighted_negative
+            )
+
+
+@njit(
+    void(
+        _readonly_vector, _readonly_vector, _readonly_vector, _readonly_vector,
+        float64, float64, boolean, float64[:, :],
+    ),
+    **_kernel_options,
+)
+def _capital_processes_convex(
+    x, lambdas_positive, lambdas_negative, m_grid, trunc_scale, theta, m_trunc, out
+):
+    n = len(x)
+
+    for k in prange(len(m_grid)):
+        m = m_grid[k]
+
+        # If mu_t < 0 or mu_t > 1, we cannot be under the null
+        if m < 0.0 or m > 1.0:
+            for t in range(n):
+                out[k, t] = np.inf
+            continue
+
+        upper_trunc_positive, lower_trunc_positive = _positive_truncation_bounds(
+            m, trunc_scale, m_trunc
+        )
+        upper_trunc_negative = lower_trunc_positive
+        lower_trunc_negative = upper_trunc_positive
+
+        capital_positive = 1.0
+        capital_negative = 1.0
+
+        for t in range(n):
+            diff = x[t] - m
+
+            lambda_positive = lambdas_positive[t]
+            if lambda_positive > upper_trunc_positive:
+                lambda_positive = upper_trunc_positive
+            if lambda_positive < -lower_trunc_positive:
+                lambda_positive = -lower_trunc_positive
+
+            lambda_negative = lambdas_negative[t]
+            if lambda_negative > upper_trunc_negative:
+                lambda_negative = upper_trunc_negative
+            if lambda_negative < -lower_trunc_negative:
+                lambda_negative = -lower_trunc_negative
+
+            capital_positive = capital_positive * (1.0 + lambda_positive * diff)
+            capital_negative = capital_negative * (1.0 - lambda_negative * diff)
+            # inf * 0 should be 0, as in the NumPy path's nan_to_num
+            if np.isnan(capital_positive):
+                capital_positive = 0.0
+            if np.isnan(capital_negative):
+                capital_negative = 0.0
+
+            out[k, t] = theta * capital_positive + (1.0 - theta) * capital_negative
+
+
+def _capital_processes(
+    x,
+    lambdas_positive,
+    lambdas_negative,
+    m_grid,
+    trunc_scale,
+    theta,
+    convex_comb,
+    m_trunc,
+    out,
+):
+    """
+    Fill `out[k, t]` with the capital process at time `t` for null mean
+    `m_grid[k]`, where the (finite) bets `lambdas_positive` and
+    `lambdas_negative` are shared across grid points.
+
+    Dispatches on the combine mode, which is fixed for the whole call:
+    `theta` exactly 1 (or 0) needs only the positive (or negative)
+    process, and otherwise the processes are combined by maximum or by
+    convex combination.
+    """
+    if theta == 1.0:
+        _capital_processes_positive(
+            x, lambdas_positive, m_grid, trunc_scale, m_trunc, out
+        )
+    elif theta == 0.0:
+        _capital_processes_negative(
+            x, lambdas_negative, m_grid, trunc_scale, m_trunc, out
+        )
+    elif convex_comb:
+        _capital_processes_convex(
+            x, lambdas_positive, lambdas_negative, m_grid, trunc_scale, theta,
+            m_trunc, out,
+        )
+    else:
+        _capital_processes_max(
+            x, lambdas_positive, lambdas_negative, m_grid, trunc_scale, theta,
+            m_trunc, out,
+        )
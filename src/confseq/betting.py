@@ -1,13 +1,38 @@
 import numpy as np
 import math
-import matplotlib.pyplot as plt
-from time import time
-from scipy.optimize import minimize, newton, root
-import multiprocess
-from copy import copy, deepcopy
-from logging import info, warnings
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logging import info
 
 from confseq.predmix import lambda_predmix_eb
+from confseq.misc import _lagged
+from confseq._betting_kernels import _capital_processes
+
+
+_scratch = threading.local()
+
+
+def _get_scratch(shape, dtype=np.bool_):
+    """
+    Uninitialized scratch array of the given shape and dtype, reusing a
+    per-thread cached allocation whenever the requested size fits. This
+    avoids re-allocating (and, with `np.zeros`, zero-filling) the
+    `(breaks + 1, len(x))` membership matrix on every grid-based
+    confidence sequence call.
+
+    Callers must fully overwrite the contents and must not hold on to
+    the array beyond the call that requested it.
+    """
+    cache = getattr(_scratch, "arrays", None)
+    if cache is None:
+        cache = _scratch.arrays = {}
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape))
+    buf = cache.get(dtype.str)
+    if buf is None or buf.size < size:
+        buf = cache[dtype.str] = np.empty(max(size, 1), dtype=dtype)
+    return buf[:size].reshape(shape)
 
 
 def betting_mart(
@@ -21,6 +46,7 @@ def betting_mart(
     theta=1 / 2,
     trunc_scale=1 / 2,
     m_trunc=True,
+    _cx=None,
 ):
     """
     Betting martingale for a given sequence
@@ -78,38 +104,156 @@ def betting_mart(
         The martingale that results from the observed x
     """
 
+    return _betting_mart_grid(
+        x,
+        np.array([m], dtype=float),
+        alpha=alpha,
+        lambdas_fn_positive=lambdas_fn_positive,
+        lambdas_fn_negative=lambdas_fn_negative,
+        N=N,
+        convex_comb=convex_comb,
+        theta=theta,
+        trunc_scale=trunc_scale,
+        m_trunc=m_trunc,
+        _cx=_cx,
+    )[0]
+
+
+def _lambdas_grid(lambdas_fn, x, m_grid):
+    """
+    Evaluate a bets function on an entire grid of null means at once,
+    yielding an array broadcastable to `(len(m_grid), len(x))`.
+
+    Bets functions which broadcast (e.g. those ignoring `m`, or simple
+    elementwise expressions in `m`) are evaluated in a single vectorized
+    call; anything else falls back to one call per grid point. The
+    result is left un-broadcast so that callers can detect bets which
+    are shared across the grid.
+    """
+    try:
+        lambdas = np.asarray(lambdas_fn(x, m_grid[:, None]), dtype=float)
+        np.broadcast_shapes(lambdas.shape, (len(m_grid), len(x)))
+    except Exception:
+        # Anything the function raises when handed a 2-D m means it
+        # cannot be evaluated vectorized; call it per grid point as the
+        # pre-vectorized code did
+        return np.stack([np.broadcast_to(lambdas_fn(x, m), len(x)) for m in m_grid])
+
+    # A function which reduces over x (rather than being elementwise in
+    # m) can return something that broadcasts to the right shape but
+    # holds values contaminated by the whole grid at once. Only trust
+    # the vectorized call if spot-checked rows agree with direct
+    # evaluation at single grid points.
+    full = np.broadcast_to(lambdas, (len(m_grid), len(x)))
+    for k in {0, len(m_grid) - 1}:
+        row = np.broadcast_to(
+            np.asarray(lambdas_fn(x, m_grid[k]), dtype=float), len(x)
+        )
+        if not np.array_equal(full[k], row, equal_nan=True):
+            return np.stack(
+                [np.broadcast_to(lambdas_fn(x, m), len(x)) for m in m_grid]
+            )
+
+    return lambdas
+
+
+def _betting_mart_grid(
+    x,
+    m_grid,
+    alpha=0.05,
+    lambdas_fn_positive=None,
+    lambdas_fn_negative=None,
+    N=None,
+    convex_comb=False,
+    theta=1 / 2,
+    trunc_scale=1 / 2,
+    m_trunc=True,
+    _cx=None,
+):
+    """
+    Betting martingales for an entire grid of null means, computed as a
+    single `(len(m_grid), len(x))` vectorized pass. This is the
+    workhorse behind both `betting_mart` (a one-row grid) and the
+    grid-based confidence sequences, which would otherwise recompute
+    the bets and prefix scans from scratch for each candidate mean.
+
+    Parameters are as in `betting_mart`, except that `m_grid` is an
+    array-like of candidate null means.
+
+    Returns
+    -------
+    capital_process_mtx, (len(m_grid), len(x)) matrix
+        One capital process per row of `m_grid`.
+    """
+    m_grid = np.asarray(m_grid, dtype=float)
+    n = len(x)
+
     if lambdas_fn_positive is None:
-        lambdas_fn_positive = lambda x, m: lambda_predmix_eb(x, alpha=alpha)
+        lambdas_fn_positive = lambda x, m: lambda_predmix_eb(x, alpha=alpha, _cx=_cx)
 
     if lambdas_fn_negative is None:
         lambdas_fn_negative = lambdas_fn_positive
 
+    lambdas_positive = _lambdas_grid(lambdas_fn_positive, x, m_grid)
+    lambdas_negative = _lambdas_grid(lambdas_fn_negative, x, m_grid)
+
+    assert 0 < trunc_scale <= 1
+
+    # Fast path: when sampling with replacement and the bets are shared
+    # across grid points (the common case), run the compiled kernel,
+    # which parallelizes over the grid and applies truncation inline.
+    shared_bets = lambdas_positive.ndim < 2 or lambdas_positive.shape[0] == 1
+    shared_bets = shared_bets and (
+        lambdas_negative.ndim < 2 or lambdas_negative.shape[0] == 1
+    )
+    if (
+        N is None
+        and shared_bets
+        and np.all(np.isfinite(lambdas_positive))
+        and np.all(np.isfinite(lambdas_negative))
+    ):
+        capital_process = np.empty((len(m_grid), n))
+        _capital_processes(
+            np.ascontiguousarray(x, dtype=float),
+            np.ascontiguousarray(np.broadcast_to(np.ravel(lambdas_positive), n)),
+            np.ascontiguousarray(np.broadcast_to(np.ravel(lambdas_negative), n)),
+            np.ascontiguousarray(m_grid),
+            trunc_scale,
+            theta,
+            convex_comb,
+            m_trunc,
+            capital_process,
+        )
+
+        assert not np.any(np.isnan(capital_process))
+
+        assert np.all(capital_process >= 0)
+
+        return capital_process
+
     if N is not None:
-        t = np.arange(1, len(x) + 1)
-        S_t = np.cumsum(x)
-        S_tminus1 = np.append(0, S_t[0 : (len(x) - 1)])
-        mu_t = (N * m - S_tminus1) / (N - (t - 1))
+        t = np.arange(1, n + 1)
+        S_t = np.cumsum(x) if _cx is None else _cx
+        S_tminus1 = _lagged(S_t, 0)
+        mu_t = (N * m_grid[:, None] - S_tminus1) / (N - (t - 1))
     else:
-        mu_t = np.repeat(m, len(x))
-
-    lambdas_positive = lambdas_fn_positive(x, m)
-    lambdas_negative = lambdas_fn_negative(x, m)
+        mu_t = np.broadcast_to(m_grid[:, None], (len(m_grid), n))
 
-    assert 0 < trunc_scale <= 1
-    # if we want to truncate with m
+    lambdas_positive = np.broadcast_to(lambdas_positive, (len(m_grid), n))
+    lambdas_negative = np.broadcast_to(lambdas_negative, (len(m_grid), n))
+    # if we want to truncate with m; a single clip per side halves the
+    # memory traffic of a minimum/maximum pair
     if m_trunc:
         with np.errstate(divide="ignore"):
-            lambdas_positive = np.minimum(lambdas_positive, trunc_scale / mu_t)
-            lambdas_positive = np.maximum(lambdas_positive, -trunc_scale / (1 - mu_t))
-
-            lambdas_negative = np.minimum(lambdas_negative, trunc_scale / (1 - mu_t))
-            lambdas_negative = np.maximum(lambdas_negative, -trunc_scale / mu_t)
+            lambdas_positive = np.clip(
+                lambdas_positive, -trunc_scale / (1 - mu_t), trunc_scale / mu_t
+            )
+            lambdas_negative = np.clip(
+                lambdas_negative, -trunc_scale / mu_t, trunc_scale / (1 - mu_t)
+            )
     else:
-        lambdas_positive = np.minimum(lambdas_positive, trunc_scale)
-        lambdas_positive = np.maximum(lambdas_positive, -trunc_scale)
-
-        lambdas_negative = np.minimum(lambdas_negative, trunc_scale)
-        lambdas_negative = np.maximum(lambdas_negative, -trunc_scale)
+        lambdas_positive = np.clip(lambdas_positive, -trunc_scale, trunc_scale)
+        lambdas_negative = np.clip(lambdas_negative, -trunc_scale, trunc_scale)
 
     with np.errstate(invalid="ignore"):
         multiplicand_positive = 1 + lambdas_positive * (x - mu_t)
@@ -123,15 +267,20 @@ def betting_mart(
     multiplicand_negative[
         np.logical_and(lambdas_negative == math.inf, x - mu_t == 0)
     ] = 1
-    
+
     with np.errstate(invalid="ignore"):
-        capital_process_positive = np.cumprod(multiplicand_positive)
-        capital_process_negative = np.cumprod(multiplicand_negative)
+        capital_process_positive = np.cumprod(multiplicand_positive, axis=1)
+        capital_process_negative = np.cumprod(multiplicand_negative, axis=1)
+
+    # If we get nans from 0 * inf, this should be 0. nan_to_num does
+    # the fix-up in one in-place pass without a boolean temporary
+    np.nan_to_num(
+        capital_process_positive, copy=False, nan=0.0, posinf=math.inf
+    )
+    np.nan_to_num(
+        capital_process_negative, copy=False, nan=0.0, posinf=math.inf
+    )
 
-    # If we get nans from 0 * inf, this should be 0
-    capital_process_positive[np.isnan(capital_process_positive)] = 0
-    capital_process_negative[np.isnan(capital_process_negative)] = 0
-    
     if theta == 1:
         capital_process = theta * capital_process_positive
     elif theta == 0:
@@ -146,13 +295,13 @@ def betting_mart(
             capital_process = np.maximum(
                 theta * capital_process_positive, (1 - theta) * capital_process_negative
             )
-    
+
     # If mu_t < 0 or mu_t > 1, we cannot be under the null
     capital_process[np.logical_or(mu_t < 0, mu_t > 1)] = math.inf
-    
-    assert not any(np.isnan(capital_process))
 
-    assert all(capital_process >= 0)
+    assert not np.any(np.isnan(capital_process))
+
+    assert np.all(capital_process >= 0)
 
     return capital_process
 
@@ -244,6 +393,24 @@ def betting_cs(
 
     assert len(lambdas_fns_positive) == len(lambdas_fns_negative)
 
+    # The default bets ignore m, so evaluate them once up-front rather
+    # than once per candidate mean in the grid
+    default_lambdas = None
+    lambdas_fns_positive = list(lambdas_fns_positive)
+    lambdas_fns_negative = (
+        lambdas_fns_positive
+        if lambdas_fns_negative is lambdas_fns_positive
+        else list(lambdas_fns_negative)
+    )
+    for fns in (lambdas_fns_positive, lambdas_fns_negative):
+        for k in range(len(fns)):
+            if fns[k] is None:
+                if default_lambdas is None:
+                    default_lambdas = lambda_predmix_eb(x, alpha=alpha)
+                fns[k] = lambda x, m: default_lambdas
+
+    _cx = np.cumsum(x)
+
     mart_fn = lambda x, m: diversified_betting_mart(
         x,
         m,
@@ -255,6 +422,21 @@ def betting_cs(
         convex_comb=convex_comb,
         trunc_scale=trunc_scale,
         m_trunc=m_trunc,
+        _cx=_cx,
+    )
+
+    mart_fn_grid = lambda x, m_grid: _diversified_betting_mart_grid(
+        x,
+        m_grid,
+        alpha=alpha,
+        lambdas_fns_positive=lambdas_fns_positive,
+        lambdas_fns_negative=lambdas_fns_negative,
+        N=N,
+        theta=theta,
+        convex_comb=convex_comb,
+        trunc_scale=trunc_scale,
+        m_trunc=m_trunc,
+        _cx=_cx,
     )
 
     l, u = cs_from_martingale(
@@ -265,6 +447,7 @@ def betting_cs(
         N=N,
         parallel=parallel,
         running_intersection=running_intersection,
+        mart_fn_grid=mart_fn_grid,
     )
 
     return l, u
@@ -282,9 +465,13 @@ def diversified_betting_mart(
     theta=1 / 2,
     trunc_scale=1 / 2,
     m_trunc=True,
+    _cx=None,
 ):
-    mart_positive = np.zeros(len(x))
-    mart_negative = np.zeros(len(x))
+    x = np.asarray(x)
+    n = len(x)
+
+    if _cx is None:
+        _cx = np.cumsum(x)
 
     # Number of betting strategies to use
     K = len(lambdas_fns_positive)
@@ -297,50 +484,168 @@ def diversified_betting_mart(
 
     assert len(lambdas_fns_positive) == len(lambdas_fns_negative)
 
-    for k in range(K):
+    assert 0 < trunc_scale <= 1
+
+    if N is not None:
+        mu = mu_t(x, m, N, _cx=_cx)
+    else:
+        mu = np.broadcast_to(float(m), n)
+
+    # Structure-of-arrays layout: gather every (nonzero-weight)
+    # strategy's bets into one (K, n) matrix per side, so truncation and
+    # the capital processes are computed in a single vectorized pass
+    # over all strategies instead of strategy-by-strategy
+    active = [k for k in range(K) if lambdas_weights[k] != 0]
+    lambdas_positive = np.empty((len(active), n))
+    lambdas_negative = np.empty((len(active), n))
+    for row, k in enumerate(active):
         lambdas_fn_positive = lambdas_fns_positive[k]
         lambdas_fn_negative = lambdas_fns_negative[k]
+        if lambdas_fn_positive is None:
+            lambdas_fn_positive = lambda x, m: lambda_predmix_eb(
+                x, alpha=alpha, _cx=_cx
+            )
+        if lambdas_fn_negative is None:
+            lambdas_fn_negative = lambdas_fn_positive
+        lambdas_positive[row] = np.broadcast_to(lambdas_fn_positive(x, m), n)
+        lambdas_negative[row] = np.broadcast_to(lambdas_fn_negative(x, m), n)
 
-        summand_positive = (
-            (
-                lambdas_weights[k]
-                * betting_mart(
-                    x,
-                    m,
-                    alpha=alpha,
-                    lambdas_fn_positive=lambdas_fn_positive,
-                    lambdas_fn_negative=lambdas_fn_negative,
-                    N=N,
-                    theta=1,
-                    trunc_scale=trunc_scale,
-                    m_trunc=m_trunc,
-                )
+    # if we want to truncate with m; clip in-place into the (K, n)
+    # bets matrices built above
+    if m_trunc:
+        with np.errstate(divide="ignore"):
+            np.clip(
+                lambdas_positive,
+                -trunc_scale / (1 - mu),
+                trunc_scale / mu,
+                out=lambdas_positive,
+            )
+            np.clip(
+                lambdas_negative,
+                -trunc_scale / mu,
+                trunc_scale / (1 - mu),
+                out=lambdas_negative,
             )
-            if lambdas_weights[k] != 0
-            else 0
+    else:
+        np.clip(lambdas_positive, -trunc_scale, trunc_scale, out=lambdas_positive)
+        np.clip(lambdas_negative, -trunc_scale, trunc_scale, out=lambdas_negative)
+
+    with np.errstate(invalid="ignore"):
+        multiplicand_positive = 1 + lambdas_positive * (x - mu)
+        multiplicand_negative = 1 - lambdas_negative * (x - mu)
+
+    # Use convention that inf * 0 = 0. We still have
+    # a martingale under the null
+    multiplicand_positive[
+        np.logical_and(lambdas_positive == math.inf, x - mu == 0)
+    ] = 1
+    multiplicand_negative[
+        np.logical_and(lambdas_negative == math.inf, x - mu == 0)
+    ] = 1
+
+    with np.errstate(invalid="ignore"):
+        capital_positive = np.cumprod(multiplicand_positive, axis=1)
+        capital_negative = np.cumprod(multiplicand_negative, axis=1)
+
+    # If we get nans from 0 * inf, this should be 0
+    np.nan_to_num(capital_positive, copy=False, nan=0.0, posinf=math.inf)
+    np.nan_to_num(capital_negative, copy=False, nan=0.0, posinf=math.inf)
+
+    # If mu < 0 or mu > 1, we cannot be under the null
+    out_of_bounds = np.logical_or(mu < 0, mu > 1)
+    capital_positive[:, out_of_bounds] = math.inf
+    capital_negative[:, out_of_bounds] = math.inf
+
+    mart_positive = np.zeros(n)
+    mart_negative = np.zeros(n)
+    for row, k in enumerate(active):
+        mart_positive = mart_positive + lambdas_weights[k] * capital_positive[row]
+        mart_negative = mart_negative + lambdas_weights[k] * capital_negative[row]
+
+    if theta == 1:
+        mart = mart_positive
+    elif theta == 0:
+        mart = mart_negative
+    else:
+        mart = (
+            theta * mart_positive + (1 - theta) * mart_negative
+            if convex_comb
+            else np.maximum(theta * mart_positive, (1 - theta) * mart_negative)
         )
 
-        mart_positive = mart_positive + summand_positive
-
-        summand_negative = (
-            (
-                lambdas_weights[k]
-                * betting_mart(
-                    x,
-                    m,
-                    alpha=alpha,
-                    lambdas_fn_positive=lambdas_fn_positive,
-                    lambdas_fn_negative=lambdas_fn_negative,
-                    N=N,
-                    theta=0,
-                    trunc_scale=trunc_scale,
-                    m_trunc=m_trunc,
-                )
-            )
-            if lambdas_weights[k] != 0
-            else 0
+    assert not any(np.isnan(mart))
+
+    return mart
+
+
+def _diversified_betting_mart_grid(
+    x,
+    m_grid,
+    lambdas_fns_positive,
+    lambdas_fns_negative=None,
+    lambdas_weights=None,
+    alpha=None,
+    N=None,
+    convex_comb=False,
+    theta=1 / 2,
+    trunc_scale=1 / 2,
+    m_trunc=True,
+    _cx=None,
+):
+    """
+    Grid analogue of `diversified_betting_mart`: one
+    `(len(m_grid), len(x))` matrix of diversified martingales, with the
+    capital processes for all candidate means computed in a single
+    vectorized pass per betting strategy.
+    """
+    m_grid = np.asarray(m_grid, dtype=float)
+
+    if _cx is None:
+        _cx = np.cumsum(x)
+
+    mart_positive = np.zeros((len(m_grid), len(x)))
+    mart_negative = np.zeros((len(m_grid), len(x)))
+
+    # Number of betting strategies to use
+    K = len(lambdas_fns_positive)
+
+    if lambdas_weights is None:
+        lambdas_weights = np.repeat(1 / K, K)
+
+    if lambdas_fns_negative is None:
+        lambdas_fns_negative = lambdas_fns_positive
+
+    assert len(lambdas_fns_positive) == len(lambdas_fns_negative)
+
+    for k in range(K):
+        if lambdas_weights[k] == 0:
+            continue
+
+        mart_positive += lambdas_weights[k] * _betting_mart_grid(
+            x,
+            m_grid,
+            alpha=alpha,
+            lambdas_fn_positive=lambdas_fns_positive[k],
+            lambdas_fn_negative=lambdas_fns_negative[k],
+            N=N,
+            theta=1,
+            trunc_scale=trunc_scale,
+            m_trunc=m_trunc,
+            _cx=_cx,
+        )
+
+        mart_negative += lambdas_weights[k] * _betting_mart_grid(
+            x,
+            m_grid,
+            alpha=alpha,
+            lambdas_fn_positive=lambdas_fns_positive[k],
+            lambdas_fn_negative=lambdas_fns_negative[k],
+            N=N,
+            theta=0,
+            trunc_scale=trunc_scale,
+            m_trunc=m_trunc,
+            _cx=_cx,
         )
-        mart_negative = mart_negative + summand_negative
 
     if theta == 1:
         mart = mart_positive
@@ -353,11 +658,70 @@ def diversified_betting_mart(
             else np.maximum(theta * mart_positive, (1 - theta) * mart_negative)
         )
 
-    assert not any(np.isnan(mart))
+    assert not np.any(np.isnan(mart))
 
     return mart
 
 
+def _adaptive_grid_membership(x, mart_fn, possible_m, alpha):
+    """
+    Boolean `(len(possible_m), len(x))` matrix indicating, for each
+    grid point and time, whether the grid point is inside the
+    confidence set, evaluating `mart_fn` on as few grid points as
+    possible.
+
+    The martingale is first evaluated on a coarse subgrid. A cell of
+    the coarse grid is then refined to full resolution if some time's
+    membership changes across it (the boundary lies inside), or if some
+    time's confidence set contains no coarse point at all (the set may
+    hide inside the cell around the martingale's minimum). Remaining
+    cells are constant and filled from their endpoints. Exact
+    equivalence with evaluating the full grid requires the martingale
+    to be quasi-convex in `m`, which holds for betting martingales.
+    """
+    n_grid = len(possible_m)
+    threshold = 1 / alpha
+
+    stride = max(1, int(math.sqrt(n_grid)))
+    coarse_idx = np.arange(0, n_grid, stride)
+    if coarse_idx[-1] != n_grid - 1:
+        coarse_idx = np.append(coarse_idx, n_grid - 1)
+
+    mart_coarse = np.vstack([mart_fn(x, possible_m[i]) for i in coarse_idx])
+    coarse_mask = mart_coarse <= threshold
+
+    # Every row is written below (coarse rows directly, interior rows
+    # per-cell), so an uninitialized scratch buffer suffices
+    confseq_mtx = _get_scratch((n_grid, len(x)), np.bool_)
+    confseq_mtx[coarse_idx] = coarse_mask
+
+    # Cells where some time's membership flips between the endpoints
+    refine = np.any(coarse_mask[:-1] != coarse_mask[1:], axis=1)
+
+    # Times whose confidence set contains no coarse point: if nonempty,
+    # it hides in one of the two cells around the coarse minimum
+    missing = ~np.any(coarse_mask, axis=0)
+    if np.any(missing):
+        min_rows = np.argmin(mart_coarse[:, missing], axis=0)
+        for row in np.unique(min_rows):
+            if row > 0:
+                refine[row - 1] = True
+            if row < len(refine):
+                refine[row] = True
+
+    for cell in range(len(coarse_idx) - 1):
+        lo, hi = coarse_idx[cell], coarse_idx[cell + 1]
+        if hi - lo <= 1:
+            continue
+        if refine[cell]:
+            for i in range(lo + 1, hi):
+                confseq_mtx[i, :] = mart_fn(x, possible_m[i]) <= threshold
+        else:
+            confseq_mtx[lo + 1 : hi, :] = confseq_mtx[lo, :]
+
+    return confseq_mtx
+
+
 def cs_from_martingale(
     x,
     mart_fn,
@@ -366,6 +730,7 @@ def cs_from_martingale(
     N=None,
     running_intersection=False,
     parallel=False,
+    mart_fn_grid=None,
 ):
     """
     Given a test supermartingale, produce a confidence sequence for
@@ -396,38 +761,58 @@ def cs_from_martingale(
     parallel, boolean
         Should computation be parallelized?
 
+    mart_fn_grid, bivariate function or None
+        A function which takes data `x` and an array-like of candidate
+        means `m_grid` and outputs a `(len(m_grid), len(x))` matrix of
+        (super)martingales in one vectorized pass. If supplied, this is
+        used instead of looping `mart_fn` over the grid.
+
     Returns
     -------
     l, array-like
         Lower confidence sequence for the parameter
     u, array-like
         Upper confidence sequence for the parameter
+
+    Notes
+    -----
+    When `mart_fn` is looped over the grid, only a coarse subgrid is
+    evaluated up-front and cells are refined where the confidence set
+    boundary can lie, assuming the martingale is quasi-convex in `m`
+    (so the confidence set at each time is an interval of the grid).
+    This holds for all of the betting martingales in this module.
     """
     possible_m = np.arange(0, 1 + 1 / breaks, step=1 / breaks)
-    confseq_mtx = np.zeros((len(possible_m), len(x)))
 
-    if parallel:
-        n_cores = multiprocess.cpu_count()
-        info("Using " + str(n_cores) + " cores")
-        with multiprocess.Pool(n_cores) as p:
-            result = p.map(lambda m: mart_fn(x, m), possible_m)
-            confseq_mtx = np.vstack(result) <= 1 / alpha
+    if mart_fn_grid is not None:
+        mart_mtx = mart_fn_grid(x, possible_m)
+        confseq_mtx = np.less_equal(
+            mart_mtx, 1 / alpha, out=_get_scratch(mart_mtx.shape, np.bool_)
+        )
+    elif parallel:
+        # The compiled kernel releases the GIL, so threads are enough
+        # to keep all cores busy without pickling x to worker processes
+        n_cores = os.cpu_count()
+        info("Using " + str(n_cores) + " threads")
+        with ThreadPoolExecutor(n_cores) as executor:
+            result = list(executor.map(lambda m: mart_fn(x, m), possible_m))
+        mart_mtx = np.vstack(result)
+        confseq_mtx = np.less_equal(
+            mart_mtx, 1 / alpha, out=_get_scratch(mart_mtx.shape, np.bool_)
+        )
     else:
-        for i in np.arange(0, len(possible_m)):
-            m = possible_m[i]
-            confseq_mtx[i, :] = mart_fn(x, m) <= 1 / alpha
-
-    l = np.zeros(len(x))
-    u = np.ones(len(x))
-
-    for j in np.arange(0, len(x)):
-        where_in_cs = np.where(confseq_mtx[:, j])
-        if len(where_in_cs[0]) == 0:
-            l[j] = 0
-            u[j] = 1
-        else:
-            l[j] = possible_m[where_in_cs[0][0]]
-            u[j] = possible_m[where_in_cs[0][-1]]
+        confseq_mtx = _adaptive_grid_membership(x, mart_fn, possible_m, alpha)
+
+    # First/last True per column via argmax, instead of a Python loop
+    # over columns with a np.where each. Every path above produces a
+    # bool matrix, which is 8x smaller than float64 and keeps this
+    # boundary-search pass cache-friendly
+    any_in_cs = confseq_mtx.any(axis=0)
+    first_in_cs = confseq_mtx.argmax(axis=0)
+    last_in_cs = confseq_mtx.shape[0] - 1 - confseq_mtx[::-1, :].argmax(axis=0)
+
+    l = np.where(any_in_cs, possible_m[first_in_cs], 0.0)
+    u = np.where(any_in_cs, possible_m[last_in_cs], 1.0)
     l = np.maximum(0, l - 1 / breaks)
     u = np.minimum(1, u + 1 / breaks)
 
@@ -640,11 +1025,14 @@ def logical_cs(x, N):
     return l, u
 
 
-def mu_t(x, m, N):
-    t = np.arange(1, len(x) + 1)
-    S_t = np.cumsum(x)
-    S_tminus1 = np.append(0, S_t[0 : (len(x) - 1)])
-    mu_t = (N * m - S_tminus1) / (N - (t - 1))
+def mu_t(x, m, N, _cx=None):
+    # (N * m - S_{t-1}) / (N - (t - 1)), built in-place so that no
+    # intermediate S_{t-1} array is materialized
+    S_t = np.cumsum(x) if _cx is None else _cx
+    mu_t = np.empty(len(x))
+    mu_t[0] = N * m
+    np.subtract(N * m, S_t[: len(x) - 1], out=mu_t[1:])
+    mu_t /= N - np.arange(len(x))
 
     return mu_t
 
@@ -779,10 +1167,10 @@ def get_ci_seq(x, ci_fn, times, parallel=False):
     u = np.repeat(1.0, len(times))
 
     if parallel:
-        n_cores = multiprocess.cpu_count()
-        print("Using " + str(n_cores) + " cores")
-        with multiprocess.Pool(n_cores) as p:
-            result = np.array(p.map(lambda time: ci_fn(x[0:time]), times))
+        n_cores = os.cpu_count()
+        print("Using " + str(n_cores) + " threads")
+        with ThreadPoolExecutor(n_cores) as executor:
+            result = np.array(list(executor.map(lambda time: ci_fn(x[0:time]), times)))
         l, u = result[:, 0], result[:, 1]
     else:
         for i in np.arange(0, len(times)):
@@ -869,21 +1257,31 @@ def betting_ci_seq(
 
     u, array-like of reals
         Upper confidence intervals
+
+    Notes
+    -----
+    Since the bets are predictable (they only depend on past
+    observations), `betting_ci(x[0:t])` is exactly entry `t-1` of the
+    confidence sequence computed on all of `x`. The whole sequence of
+    intervals is therefore obtained from a single pass over the data
+    rather than recomputing `betting_ci` from scratch for each time.
     """
+    x = np.array(x)
+    times = np.asarray(times, dtype=int)
 
-    def ci_fn(x):
-        return betting_ci(
-            x,
-            alpha=alpha,
-            breaks=breaks,
-            lambdas_fns_positive=lambdas_fns_positive,
-            lambdas_fns_negative=lambdas_fns_negative,
-            N=N,
-            running_intersection=running_intersection,
-            convex_comb=convex_comb,
-            theta=theta,
-            trunc_scale=trunc_scale,
-            m_trunc=m_trunc,
-        )
+    l, u = betting_cs(
+        x,
+        alpha=alpha,
+        breaks=breaks,
+        lambdas_fns_positive=lambdas_fns_positive,
+        lambdas_fns_negative=lambdas_fns_negative,
+        N=N,
+        running_intersection=running_intersection,
+        parallel=parallel,
+        convex_comb=convex_comb,
+        theta=theta,
+        trunc_scale=trunc_scale,
+        m_trunc=m_trunc,
+    )
 
-    return get_ci_seq(x, ci_fn, times=times, parallel=parallel)
+    return l[times - 1], u[times - 1]
@@ -2,6 +2,9 @@ import math
 import numpy as np
 from scipy.optimize import root
 
+from confseq.misc import _lagged
+from confseq._betting_kernels import _lambda_predmix_eb
+
 
 def lambda_predmix_eb(
     x,
@@ -12,6 +15,7 @@ def lambda_predmix_eb(
     prior_variance=1 / 4,
     fake_obs=1,
     scale=1,
+    _cx=None,
 ):
     """
     Predictable mixture lambda values or "bets"
@@ -46,27 +50,25 @@ def lambda_predmix_eb(
         Scale by which to multiply final lambda output.
         For most applications, this should be left as 1
 
+    _cx, array-like of reals or None
+        Precomputed `np.cumsum(x)`. Retained for callers that hold the
+        prefix sums of `x`; the compiled kernel streams over `x` once
+        and maintains the running sum itself, so this is no longer used.
+
     Returns
     -------
     lambdas, array-like of positive reals
         A (numpy) array of lambda values or "bets"
     """
-    t = np.arange(1, len(x) + 1)
-    mu_hat_t = (fake_obs * prior_mean + np.cumsum(x)) / (t + fake_obs)
-    mu_hat_tminus1 = np.append(prior_mean, mu_hat_t[0 : (len(x) - 1)])
-    sigma2_t = (fake_obs * prior_variance + np.cumsum(np.power(x - mu_hat_t, 2))) / (
-        t + fake_obs
+    lambdas = _lambda_predmix_eb(
+        np.ascontiguousarray(x, dtype=np.float64),
+        truncation,
+        alpha,
+        0 if fixed_n is None else int(fixed_n),
+        prior_mean,
+        prior_variance,
+        fake_obs,
     )
-    sigma2_tminus1 = np.append(prior_variance, sigma2_t[0 : (len(x) - 1)])
-    if fixed_n is None:
-        lambdas = np.sqrt(2 * np.log(1 / alpha) / (t * np.log(1 + t) * sigma2_tminus1))
-    else:
-        lambdas = np.sqrt(2 * np.log(1 / alpha) / (fixed_n * sigma2_tminus1))
-
-    lambdas[np.isnan(lambdas)] = 0
-
-    lambdas = np.minimum(truncation, lambdas)
-
     return lambdas * scale
 
 
@@ -82,14 +84,14 @@ def lambda_aKelly(
     assert trunc_scale > 0 and trunc_scale <= 1
     t = np.arange(1, len(x) + 1)
     S_t = np.cumsum(x)
-    x_tminus1 = np.append(0, x[0 : (len(x) - 1)])
+    x_tminus1 = _lagged(x, 0)
     S_tminus1 = np.cumsum(x_tminus1)
     mu_hat_t = (fake_obs * prior_mean + np.cumsum(x)) / (t + fake_obs)
-    mu_hat_tminus1 = np.append(prior_mean, mu_hat_t[0 : (len(x) - 1)])
+    mu_hat_tminus1 = _lagged(mu_hat_t, prior_mean)
     V_t = (fake_obs * prior_variance + np.cumsum(np.power(x - mu_hat_t, 2))) / (
         t + fake_obs
     )
-    V_tminus1 = np.append(prior_variance, V_t[0 : (len(x) - 1)])
+    V_tminus1 = _lagged(V_t, prior_variance)
 
     if N is not None:
         conditional_mu_hat_tminus1 = (N * mu_hat_tminus1 - S_tminus1) / (N - t + 1)
@@ -102,8 +104,7 @@ def lambda_aKelly(
         V_tminus1 + np.power(conditional_mu_hat_tminus1 - mu_t, 2)
     )
 
-    lambdas = np.maximum(-trunc_scale / (1 - mu_t), lambdas)
-    lambdas = np.minimum(trunc_scale / mu_t, lambdas)
+    lambdas = np.clip(lambdas, -trunc_scale / (1 - mu_t), trunc_scale / mu_t)
 
     return lambdas
 
@@ -133,10 +134,8 @@ def lambda_LBOW(x, m):
     t = np.arange(1, len(x) + 1)
     S_t = np.cumsum(x)
     mu_hat_t = (1 / 2 + S_t) / (t + 1)
-    mu_hat_tminus1 = np.append(1 / 2, mu_hat_t[0 : (len(mu_hat_t) - 1)])
-    sigma2_tminus1 = np.append(1 / 4, np.cumsum(np.power(x - m, 2)))[0 : len(x)] / (
-        t + 1
-    )
+    mu_hat_tminus1 = _lagged(mu_hat_t, 1 / 2)
+    sigma2_tminus1 = _lagged(np.cumsum(np.power(x - m, 2)), 1 / 4) / (t + 1)
 
     g = mu_hat_tminus1 - m
     M = np.where(g > 0, m, 1 - m)
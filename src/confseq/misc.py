@@ -1,6 +1,19 @@
 import numpy as np
 
 
+def _lagged(arr, first):
+    """
+    Shift `arr` right by one position, inserting `first` at the front.
+
+    Equivalent to `np.append(first, arr[:-1])` but with a single
+    allocation and copy instead of two.
+    """
+    out = np.empty(len(arr), dtype=np.result_type(arr, first))
+    out[0] = first
+    out[1:] = arr[: len(arr) - 1]
+    return out
+
+
 def superMG_crossing_fraction(mart_fn, dist_fn, alpha, repeats):
     exceeded = [None] * repeats
     for i in range(repeats):
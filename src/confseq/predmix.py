@@ -1,6 +1,8 @@
 import math
 import numpy as np
 from confseq.betting_strategies import lambda_predmix_eb
+from confseq.misc import _lagged
+from confseq._betting_kernels import _empbern_scans
 
 
 def predmix_empbern_cs(
@@ -41,19 +43,16 @@ def predmix_empbern_cs(
     """
     x = np.array(x)
 
-    t = np.arange(1, len(x) + 1)
-    mu_hat_t = np.cumsum(x) / t
-    mu_hat_tminus1 = np.append(0, mu_hat_t[0 : (len(x) - 1)])
+    lambdas = lambda_predmix_eb(x, truncation=truncation, alpha=alpha / 2, fixed_n=fixed_n)
 
-    lambdas = lambda_predmix_eb(
-        x, truncation=truncation, alpha=alpha / 2, fixed_n=fixed_n
+    # The running means, psi terms, and all of their prefix sums are
+    # fused into a single compiled pass over x
+    weighted_mu_hat_t, margin = _empbern_scans(
+        np.ascontiguousarray(x, dtype=np.float64),
+        np.ascontiguousarray(lambdas),
+        np.log(2 / alpha),
     )
 
-    psi = np.power(x - mu_hat_tminus1, 2) * (-np.log(1 - lambdas) - lambdas)
-    margin = (np.log(2 / alpha) + np.cumsum(psi)) / np.cumsum(lambdas)
-
-    weighted_mu_hat_t = np.cumsum(x * lambdas) / np.cumsum(lambdas)
-
     l, u = weighted_mu_hat_t - margin, weighted_mu_hat_t + margin
     l = np.maximum(l, 0)
     u = np.minimum(u, 1)
@@ -160,14 +159,14 @@ def predmix_empbern_cs_wor(
     x = np.array(x)
     t = np.arange(1, len(x) + 1)
     S_t = np.cumsum(x)
-    S_tminus1 = np.append(0, S_t[0 : (len(S_t) - 1)])
+    S_tminus1 = _lagged(S_t, 0)
     mu_hat_tminus1 = (1 / 2 + S_tminus1) / t
 
     Zstar = S_tminus1 / (N - t + 1)
     Wstar = (t - 1) / (N - t + 1)
 
     V_t = np.cumsum(1 / 4 + np.power(x - mu_hat_tminus1, 2)) * np.power(c / 2, -2)
-    V_tminus1 = np.append(4 * np.power(c / 2, -2) / 4, V_t[0 : (len(x) - 1)])
+    V_tminus1 = _lagged(V_t, 4 * np.power(c / 2, -2) / 4)
 
     # If the user doesn't supply a sequence of lambdas,
     # use a sensible default.
@@ -175,14 +174,14 @@ def predmix_empbern_cs_wor(
         lambdas = np.sqrt(
             8 * np.log(2 / alpha) / (V_tminus1 * np.log(1 + t) * np.power(c, 2))
         )
-        lambdas[np.logical_or(np.isnan(lambdas), lambdas == math.inf)] = 0
+        np.nan_to_num(lambdas, copy=False, nan=0.0, posinf=0.0)
         lambdas = np.minimum(1 / (2 * c), lambdas)
 
     weighted_mu_hat_t = np.cumsum(lambdas * (x + Zstar)) / np.cumsum(
         lambdas * (1 + Wstar)
     )
 
-    psi = (-np.log(1 - c * lambdas) - c * lambdas) / 4
+    psi = (-np.log1p(-c * lambdas) - c * lambdas) / 4
 
     margin = (
         np.cumsum(np.power(c / 2, -2) * np.power(x - mu_hat_tminus1, 2) * psi)
@@ -240,12 +239,12 @@ def predmix_hoeffding_cs_wor(
     x = np.array(x)
     t = np.arange(1, len(x) + 1)
     S_t = np.cumsum(x)
-    S_tminus1 = np.append(0, S_t[0 : (len(x) - 1)])
+    S_tminus1 = _lagged(S_t, 0)
 
     Zstar = S_tminus1 / (N - t + 1)
     Wstar = (t - 1) / (N - t + 1)
     # remove later
-    Wstar = np.append(0, t / (N - t))[0 : (len(S_t))]
+    Wstar = _lagged(t / (N - t), 0)
 
     if lambdas is None:
         lambdas = np.sqrt(
@@ -253,7 +252,7 @@ def predmix_hoeffding_cs_wor(
             * np.log(2 / alpha)
             / (t * np.log(1 + t) * np.power(upper_bd - lower_bd, 2))
         )
-        lambdas[np.logical_or(np.isnan(lambdas), lambdas == math.inf)] = 0
+        np.nan_to_num(lambdas, copy=False, nan=0.0, posinf=0.0)
         lambdas = np.minimum(1 / np.sqrt(np.power(upper_bd - lower_bd, 2)), lambdas)
 
     psi = np.cumsum(np.power(lambdas, 2)) * np.power(upper_bd - lower_bd, 2) / 8
@@ -2,6 +2,7 @@ from math import isnan
 import pytest
 import numpy as np
 from confseq.betting import *
+from confseq.betting import _betting_mart_grid
 from confseq.misc import superMG_crossing_fraction, expand_grid
 from scipy.stats import binomtest
 from itertools import permutations
@@ -166,3 +167,66 @@ def test_get_ci_seq():
         l, u = ci_fn(x[0 : times[i]])
         assert l_seq[i] == l
         assert u_seq[i] == u
+
+
+@pytest.mark.parametrize("convex_comb", [True, False])
+def test_betting_mart_grid(convex_comb):
+    # The grid-based martingale matrix should agree row-by-row with
+    # individual calls to betting_mart
+    n = 1000
+    x = np.random.beta(1, 1, n)
+    m_grid = np.arange(0, 1.1, step=0.1)
+    mart_mtx = _betting_mart_grid(x, m_grid, convex_comb=convex_comb)
+    for i in range(len(m_grid)):
+        assert all(mart_mtx[i, :] == betting_mart(x, m_grid[i], convex_comb=convex_comb))
+
+
+@pytest.mark.parametrize("theta", [0, 0.5, 1])
+def test_betting_mart_inf_times_zero(theta):
+    # Once the capital overflows to inf, a zero multiplicand should
+    # bring it to 0 (the inf * 0 = 0 convention), not nan
+    x = np.ones(150)
+    x[-1] = 0.0
+    big_bets = lambda x, m: np.full(len(x), 1e6)
+    mart = betting_mart(
+        x,
+        0.001,
+        lambdas_fn_positive=big_bets,
+        theta=theta,
+        trunc_scale=1.0,
+        m_trunc=True,
+    )
+    assert not any(np.isnan(mart))
+
+
+def test_betting_mart_grid_reduction_bets():
+    # A bets function that reduces over x broadcasts against the whole
+    # grid at once, so the vectorized evaluation cannot be trusted for
+    # it; the grid must still agree with per-m calls to betting_mart
+    n = 500
+    x = np.random.beta(1, 1, n)
+    reduction_fn = lambda x, m: np.minimum(
+        0.5, 1.0 / (np.sum((x - m) ** 2) / len(x) + 1)
+    )
+    m_grid = np.arange(0, 1.1, step=0.1)
+    mart_mtx = _betting_mart_grid(x, m_grid, lambdas_fn_positive=reduction_fn)
+    for i in range(len(m_grid)):
+        assert all(
+            mart_mtx[i, :]
+            == betting_mart(x, m_grid[i], lambdas_fn_positive=reduction_fn)
+        )
+
+
+def test_betting_ci_seq():
+    # The single-pass implementation should match recomputing
+    # betting_ci on each prefix, since the bets are predictable
+    times = [10, 50, 100]
+    x = np.random.beta(1, 1, 100)
+    l_seq, u_seq = betting_ci_seq(x, alpha=0.05, times=times, breaks=100)
+
+    for i in range(len(times)):
+        l, u = betting_ci(
+            x[0 : times[i]], alpha=0.05, breaks=100, trunc_scale=0.9, m_trunc=True
+        )
+        assert l_seq[i] == l
+        assert u_seq[i] == u